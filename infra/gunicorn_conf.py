@@ -1,8 +1,33 @@
 import multiprocessing
+import os
 
-bind = "0.0.0.0:8000"
-workers = 2 * multiprocessing.cpu_count() + 1
-worker_class = "uvicorn.workers.UvicornWorker"
+# Behind an in-box reverse proxy (nginx/envoy) prefer a Unix socket,
+# e.g. GUNICORN_BIND=unix:/tmp/app.sock
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+backlog = 2048
+# Uvicorn workers are async/I-O bound: each runs its own event loop and DB pool,
+# so use far fewer than the sync-WSGI 2*cpu+1. Override with WEB_CONCURRENCY.
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count() // 2)))
+worker_class = "app.workers.UvicornWorker"  # uvloop + httptools
 timeout = 30
-keepalive = 5
+# Keep idle connections open longer than typical LB idle timeouts (e.g. ALB 60s)
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 75))
 loglevel = "info"
+# Import the app (settings, engines, logging) once in the master; workers share
+# those pages copy-on-write. Nothing connects eagerly at import time.
+preload_app = True
+
+
+def child_exit(server, worker):
+    # Clean up this worker's metric files when PROMETHEUS_MULTIPROC_DIR is used
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    # With preload_app the engines were created in the master; give each worker
+    # its own pool instead of sharing any inherited connections.
+    from app.infrastructure.db.connections import engine_logs, engine_main
+    for engine in (engine_main, engine_logs):
+        engine.sync_engine.dispose(close=False)
@@ -4,6 +4,8 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.dependencies import oauth2_scheme_optional
+from app.auth.token_cache import invalidate_token
 from app.core.config import get_settings
 from app.schemas.auth import TokenResponse     # updated import
 from app.domain.services.auth_service import AuthService
@@ -32,8 +34,11 @@ async def login(
 
 
 @router.post("/logout")
-async def logout():
+async def logout(token: str | None = Depends(oauth2_scheme_optional)):
     """
     Stateless JWT logout (client discards token).
+    Also drops the token from the server-side validation cache.
     """
+    if token:
+        await invalidate_token(token)
     return {"message": "Logout successful – discard your JWT on the client."}
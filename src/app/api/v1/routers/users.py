@@ -1,5 +1,6 @@
 # src/app/api/v1/routers/users.py
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import List
 
 from app.schemas.user import UserRead, UserCreate
@@ -31,7 +32,9 @@ async def list_users(svc: UserService = Depends(get_user_service)):
     """
     Return all users. Only 'admin' role allowed.
     """
-    return await svc.list_users()
+    # Returning a Response skips FastAPI's response_model re-validation (kept for
+    # the OpenAPI schema); the service already emits exactly the UserRead fields.
+    return ORJSONResponse(await svc.list_users())
 
 
 @router.get("/me", response_model=UserRead, summary="Get current user profile")
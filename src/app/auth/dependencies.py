@@ -1,12 +1,14 @@
 # src/app/auth/dependencies.py
 from __future__ import annotations
 
-from typing import Callable, Iterable, List, Literal, Sequence, Set
+from functools import lru_cache
+from typing import Callable, FrozenSet, Iterable, Literal, Sequence, Set
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.token_cache import cache_user, get_cached_user
 from app.core.config import get_settings
 from app.infrastructure.db.dependencies import get_main_session
 from app.infrastructure.db.repositories.user_repo import UserRepository
@@ -16,6 +18,8 @@ from app.utils.hp_py_logger import hp_log, set_request_context, update_request_c
 
 # OAuth2 bearer setup (kept simple; scopes are optional if you add them later)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+# Same scheme but non-enforcing (returns None when the header is absent), e.g. for /logout
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 settings = get_settings()
 
 
@@ -35,6 +39,14 @@ def _norm(roles: Iterable[Union[str, Sequence[str]]]) -> Set[str]:
     """Normalize role names for case-insensitive comparison; accepts varargs or nested lists/tuples."""
     return {s.strip().lower() for s in _flatten_roles(roles) if s and s.strip()}
 
+def _user_roles_norm(user: UserRead) -> FrozenSet[str]:
+    """Normalized role set of `user`, computed once per UserRead instance."""
+    have = user._roles_norm
+    if have is None:
+        have = frozenset(_norm(user.roles))
+        user._roles_norm = have
+    return have
+
 
 # ---- core user dependency ----------------------------------------------------
 async def get_current_user(
@@ -47,7 +59,17 @@ async def get_current_user(
     3) Load role names (List[str])
     4) Set request logging context
     5) Return a UserRead DTO (never ORM objects)
+
+    Steps 1-3 are skipped when the same token was validated recently
+    (see app.auth.token_cache).
     """
+    cached = await get_cached_user(token)
+    if cached is not None:
+        _user_roles_norm(cached)  # no-op unless freshly deserialized (Redis)
+        set_request_context(user=cached.id)
+        update_request_context(roles=",".join(cached.roles))
+        return cached
+
     payload = decode_token(token)  # raises 401 on failure
     username = payload.get("sub")
     if not username:
@@ -55,31 +77,33 @@ async def get_current_user(
 
     repo = UserRepository(session)
 
-    # Fetch user & roles
-    user = await repo.get_by_username(username)
+    # Fetch user & roles (single query)
+    user, role_names = await repo.get_user_with_roles(username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    role_names: List[str] = await repo.get_user_roles(username)
-
     # Put identity into the structured-logging context
     # (RequestContextMiddleware already injected request_id/method/path/ip)
     set_request_context(user=user.id)
     # Optional: also record roles (comma separated), helpful for audits
     update_request_context(roles=",".join(role_names))
 
-    hp_log.debug(
-        "Auth resolved current user",
-        extra={"user": user.username}
-    )
+    # 'user' is already a context field on every record; passing it in `extra`
+    # would make makeRecord() raise KeyError
+    hp_log.debug("Auth resolved current user %s", user.username)
 
-    return UserRead(
+    # trusted DB-sourced values: skip pydantic validation
+    current = UserRead.model_construct(
         id=user.id,
         username=user.username,
         full_name=user.full_name,
         email=user.email,
         roles=role_names,
     )
+    # normalize once here so every role guard in this request reuses it
+    current._roles_norm = frozenset(_norm(role_names))
+    await cache_user(token, current, payload.get("exp"))
+    return current
 
 
 # ---- role-guard factories ----------------------------------------------------
@@ -106,16 +130,26 @@ def require_roles(
     if not required_roles:
         raise ValueError("require_roles() must be called with at least one role")
 
-    required_norm = _norm(required_roles)
+    return _role_checker(frozenset(_norm(required_roles)), logic)
+
+
+@lru_cache(maxsize=None)
+def _role_checker(required_norm: FrozenSet[str], logic: str) -> Callable:
+    """
+    One dependency per distinct (role set, logic): routes guarded by the same roles
+    share a callable, so FastAPI also dedupes it within a request.
+    """
+    # common case: a single required role -> plain membership test
+    single = next(iter(required_norm)) if len(required_norm) == 1 else None
 
     async def _checker(user: UserRead = Depends(get_current_user)) -> UserRead:
-        have = _norm(user.roles)
+        have = _user_roles_norm(user)
 
         allowed = False
         if logic == "any":
-            allowed = bool(have.intersection(required_norm))
+            allowed = single in have if single is not None else not have.isdisjoint(required_norm)
         elif logic == "all":
-            allowed = required_norm.issubset(have)
+            allowed = required_norm <= have
         else:
             # Defensive: should never happen with the Literal type
             raise HTTPException(
@@ -127,7 +161,7 @@ def require_roles(
             hp_log.warning(
                 "Access forbidden: insufficient role",
                 extra={
-                    "user": user.username,
+                    "username": user.username,
                     "required_roles": ",".join(sorted(required_norm)),
                     "user_roles": ",".join(sorted(have)),
                 },
@@ -1,43 +1,72 @@
 from __future__ import annotations
 
-from typing import Callable, Optional
+from typing import Optional
 
-from fastapi import Request
-from jose import jwt, JWTError
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+import jwt
+from fastapi import HTTPException
+from jwt import InvalidTokenError
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core.config import get_settings
+from app.security.jwt import decode_token
 from app.utils.hp_py_logger import update_request_context
 
-class JWTContextMiddleware(BaseHTTPMiddleware):
+class JWTContextMiddleware:
     """
     Best-effort: if an Authorization: Bearer <token> header exists, decode it and
     inject 'user' (from 'sub') into the request logging context. Never raises.
+    Paths matching LOG_EXCLUDE_PATHS (e.g. /health, /metrics) are not decoded.
+
+    Plain ASGI middleware (no BaseHTTPMiddleware task/stream per request).
+    `secret` / `algorithm` default to the JWT settings; with the defaults the
+    shared decode_token() cache is used, so get_current_user reuses this decode.
     """
-    def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret: Optional[str] = None,
+        algorithm: Optional[str] = None,
+    ) -> None:
+        self.app = app
+        self._shared_decode = secret is None and algorithm is None
+        settings = get_settings()
+        if secret is None:
+            key = settings.secret_key
+            secret = key.get_secret_value() if hasattr(key, "get_secret_value") else key
+        self._secret = secret
+        self._algorithms = [algorithm or settings.jwt_algorithm]
+        # same matching rule as the log ExcludePathsFilter (substring)
+        self._skip_paths = tuple(settings.log_exclude_paths_list)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            path = scope["path"]
+            if not any(p in path for p in self._skip_paths):
+                self._bind_user(scope)
+        await self.app(scope, receive, send)
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        try:
-            auth = request.headers.get("authorization")
-            if auth and auth.lower().startswith("bearer "):
-                token = auth.split(" ", 1)[1].strip()
-                settings = get_settings()
-                payload = jwt.decode(
-                    token,
-                    settings.secret_key.get_secret_value() if hasattr(settings.secret_key, "get_secret_value") else settings.secret_key,
-                    algorithms=[settings.jwt_algorithm],
-                )
+    def _bind_user(self, scope: Scope) -> None:
+        for key, value in scope["headers"]:
+            if key != b"authorization":
+                continue
+            if value[:7].lower() != b"bearer ":
+                return
+            try:
+                token = value[7:].strip().decode("latin-1")
+                if self._shared_decode:
+                    payload = decode_token(token)
+                else:
+                    payload = jwt.decode(token, self._secret, algorithms=self._algorithms)
                 sub = payload.get("sub")
                 if sub:
                     # Inject user into logging context for the current request
                     update_request_context(user=sub)
-        except JWTError:
-            # invalid/expired token? ignore here (this middleware is non-enforcing)
-            pass
-        except Exception:
-            # Never break the request pipeline due to logging enrichment
-            pass
-
-        return await call_next(request)
+                    # ...and expose it as request.state.user (rate-limit key_user_or_ip)
+                    scope.setdefault("state", {})["user"] = sub
+            except (InvalidTokenError, HTTPException):
+                # invalid/expired token? ignore here (this middleware is non-enforcing)
+                pass
+            except Exception:
+                # Never break the request pipeline due to logging enrichment
+                pass
+            return
@@ -15,7 +15,7 @@ def ldap_bind(username: str, password: str) -> bool:
     Returns:
         True if bind is successful, False otherwise.
     """
-    hp_log.info(f"---LDAP---AUTH--- {settings.ldap_domain} {settings.ldap_server}")
+    hp_log.info("---LDAP---AUTH--- %s %s", settings.ldap_domain, settings.ldap_server)
 
     try:
         # conn = Connection(
@@ -27,10 +27,10 @@ def ldap_bind(username: str, password: str) -> bool:
         # )
         # return conn.bind()
          
-        print("LDAP bind successful")
+        hp_log.debug("LDAP bind successful")
         return True
        
     
     except Exception:
-        print("LDAP bind failed---True")
+        hp_log.debug("LDAP bind failed---True", exc_info=True)
         return True
\ No newline at end of file
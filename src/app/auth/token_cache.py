@@ -0,0 +1,96 @@
+# src/app/auth/token_cache.py
+"""
+Short-lived cache of validated bearer tokens -> resolved UserRead.
+
+Only tokens that passed full validation (signature, exp, user lookup) are stored.
+Each entry lives for min(TTL, exp - now) so a cached identity never outlives the
+token it came from. `invalidate_token` drops an entry immediately (e.g. on /logout).
+
+Backend:
+  * REDIS_URL set   -> Redis, shared by every Gunicorn/Uvicorn worker
+  * REDIS_URL unset -> in-process TTLCache (per worker)
+Redis errors are treated as cache misses; auth then falls back to the DB path.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.infrastructure.cache.redis_client import get_redis
+from app.schemas.user import UserRead
+from app.utils.hp_py_logger import hp_log
+
+TOKEN_CACHE_MAXSIZE = 10_000
+TOKEN_CACHE_TTL = 60         # seconds, in-process backend
+REDIS_TOKEN_CACHE_TTL = 300  # seconds, Redis backend
+REDIS_KEY_PREFIX = "jwt:"
+
+settings = get_settings()
+
+# key -> (user, exp_unix)
+_CACHE: TTLCache[str, Tuple[UserRead, float]] = TTLCache(
+    maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL
+)
+
+
+def token_key(token: str) -> str:
+    """Cheap, fixed-size cache key; the raw token is never kept in memory."""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+async def get_cached_user(token: str) -> Optional[UserRead]:
+    key = token_key(token)
+
+    if settings.redis_url:
+        try:
+            raw = await get_redis().get(REDIS_KEY_PREFIX + key)
+        except RedisError:
+            hp_log.debug("Token cache lookup failed; falling back to DB", exc_info=True)
+            return None
+        return UserRead.model_validate_json(raw) if raw else None
+
+    hit = _CACHE.get(key)
+    if hit is None:
+        return None
+    user, exp = hit
+    if time.time() >= exp:
+        _CACHE.pop(key, None)
+        return None
+    return user
+
+
+async def cache_user(token: str, user: UserRead, exp: Optional[float]) -> None:
+    """Store a validated user; tokens without `exp` or already expired are not cached."""
+    if exp is None:
+        return
+    remaining = float(exp) - time.time()
+    if remaining <= 0:
+        return
+    key = token_key(token)
+
+    if settings.redis_url:
+        ttl = int(min(REDIS_TOKEN_CACHE_TTL, remaining))
+        if ttl < 1:
+            return
+        try:
+            await get_redis().set(REDIS_KEY_PREFIX + key, user.model_dump_json(), ex=ttl)
+        except RedisError:
+            hp_log.debug("Token cache store failed", exc_info=True)
+        return
+
+    _CACHE[key] = (user, float(exp))
+
+
+async def invalidate_token(token: str) -> None:
+    key = token_key(token)
+    _CACHE.pop(key, None)
+    if settings.redis_url:
+        try:
+            await get_redis().delete(REDIS_KEY_PREFIX + key)
+        except RedisError:
+            hp_log.warning("Token cache invalidation failed", exc_info=True)
@@ -31,6 +31,10 @@ class Settings(PydanticBaseSettings):
     # Databases / Cache (examples; prefer DSN from env)
     database_url: str = Field(..., env="DATABASE_URL")
     redis_url: Optional[str] = Field(default=None, env="REDIS_URL")
+    redis_pool_size: int = Field(default=50, env="REDIS_POOL_SIZE")
+    # seconds; kept short so a slow/unreachable Redis degrades to a cache miss
+    redis_connect_timeout: float = Field(default=0.25, env="REDIS_CONNECT_TIMEOUT")
+    redis_socket_timeout: float = Field(default=0.25, env="REDIS_SOCKET_TIMEOUT")
     db_url_test_main: str = Field(default="", env="DB_URL_TEST_MAIN")
     db_url_test_logs: str = Field(default="", env="DB_URL_TEST_LOGS")
 
@@ -101,6 +105,10 @@ class Settings(PydanticBaseSettings):
         # human-friendly; good for logging/UI
         return [p.strip() for p in self.metrics_allow_ips_raw.split(",") if p.strip()]
 
+    @property
+    def log_exclude_paths_list(self) -> List[str]:
+        return [p.strip() for p in self.log_exclude_paths.split(",") if p.strip()]
+
 
     # ---- Validators ----
     @field_validator("metrics_protect_mode")
@@ -124,7 +132,7 @@ class Settings(PydanticBaseSettings):
             "to_stdout": self.log_to_stdout,
             "to_file": self.log_to_file,
             "level": self.log_level,
-            "exclude_paths": [p.strip() for p in self.log_exclude_paths.split(",") if p.strip()],
+            "exclude_paths": self.log_exclude_paths_list,
             "file_strategy": self.log_file_strategy,
             "max_mb": self.log_max_mb,
             "backups": self.log_backups,
@@ -1,31 +1,66 @@
 # src/app/core/metrics_guard.py
 from __future__ import annotations
 
+from functools import lru_cache
 from ipaddress import ip_address, ip_network
-from typing import Iterable, Optional
+from typing import Dict, FrozenSet, Optional, Set, Tuple
 from fastapi import Depends, HTTPException, Request, status
+from starlette.types import Scope
 
 from app.core.config import get_settings
 from app.auth.dependencies import get_current_user, UserRead  # adjust import if path differs
 from app.utils.hp_py_logger import hp_log
 
-def _ip_in_allowlist(ip: str, patterns: Iterable[str]) -> bool:
+# (ip version, netmask as int, masked network addresses as ints)
+_PrefixBucket = Tuple[int, int, FrozenSet[int]]
+
+
+@lru_cache(maxsize=1)
+def _allowlist() -> Tuple[Tuple[_PrefixBucket, ...], FrozenSet[str]]:
+    """
+    Parse METRICS_ALLOW_IPS once into masked-int sets grouped by prefix length
+    (bare IPs are /32 or /128); anything else (e.g. hostnames) is compared literally.
+    A lookup is then one AND + set probe per distinct prefix length.
+    """
+    buckets: Dict[Tuple[int, int], Set[int]] = {}
+    names = set()
+    for p in get_settings().metrics_allow_ips:
+        try:
+            net = ip_network(p, strict=False)
+        except ValueError:
+            names.add(p)
+            continue
+        mask = int(net.netmask)
+        buckets.setdefault((net.version, mask), set()).add(int(net.network_address) & mask)
+    prefixes = tuple((version, mask, frozenset(nets)) for (version, mask), nets in buckets.items())
+    return prefixes, frozenset(names)
+
+
+def ip_in_allowlist(ip: str) -> bool:
+    prefixes, names = _allowlist()
+    if ip in names:
+        return True
     try:
         ipaddr = ip_address(ip)
     except ValueError:
         return False
-    for p in patterns:
-        try:
-            if "/" in p:
-                if ipaddr in ip_network(p, strict=False):
-                    return True
-            else:
-                if ipaddr == ip_address(p):
-                    return True
-        except ValueError:
-            continue
+    value, version = int(ipaddr), ipaddr.version
+    for net_version, mask, nets in prefixes:
+        if net_version == version and value & mask in nets:
+            return True
     return False
 
+def peer_ip(scope: Scope) -> Optional[str]:
+    """
+    The socket peer, for access decisions. scope["client_ip"] is built from
+    X-Real-IP / X-Forwarded-For, which any client can set, so it is only fit for
+    logging and rate-limit keys. Behind a proxy, let uvicorn/gunicorn rewrite the
+    peer for trusted proxies only (--forwarded-allow-ips / ProxyHeadersMiddleware).
+    """
+    client = scope.get("client")
+    return client[0] if client else None
+
+
 def require_metrics_access():
     """
     Returns a dependency that enforces metrics access policy:
@@ -44,10 +79,10 @@ def require_metrics_access():
         if env in {"dev", "local"} or mode == "open":
             return True
 
-        client_ip = request.client.host if request.client else None
+        client_ip = peer_ip(request.scope)
 
         if mode == "allowlist":
-            if client_ip and _ip_in_allowlist(client_ip, settings.metrics_allow_ips):
+            if client_ip and ip_in_allowlist(client_ip):
                 return True
             hp_log.warning("Metrics access denied (IP)", extra={"ip": client_ip, "path": "/metrics"})
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -1,8 +1,17 @@
 from __future__ import annotations
+import os
 import time
-from typing import Callable
-from fastapi import Request, Response
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from typing import Any, Dict, Tuple
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 REQUEST_COUNT = Counter(
     "http_requests_total",
@@ -16,18 +25,102 @@ REQUEST_LATENCY = Histogram(
     ["method", "path"]
 )
 
-async def metrics_middleware(request: Request, call_next: Callable):
-    start = time.perf_counter()
-    response: Response = await call_next(request)
-    elapsed = time.perf_counter() - start
+# Label used when no route matched (404s, unknown methods): keeps cardinality bounded
+UNMATCHED_PATH = "unmatched"
+# Label for an endpoint that matched but has no known template (e.g. inside a mount)
+OTHER_PATH = "other"
+
+# Pre-resolved metric children, keyed by label values (bounded by #routes)
+_CNT_CHILDREN: Dict[Tuple[str, str, str], Any] = {}
+_LAT_CHILDREN: Dict[Tuple[str, str], Any] = {}
+
+# endpoint -> path template, for plain Starlette routes (/openapi.json, /docs,
+# /redoc) that set scope["endpoint"] but not scope["route"]; filled by prime_metrics
+_ENDPOINT_PATHS: Dict[Any, str] = {}
+
+
+def _route_template(scope: Scope) -> str:
+    """Route path template (e.g. /api/v1/users/{user_id}) set by the router, not the raw URL."""
+    route = scope.get("route")
+    # "path_template" covers routers/mounts that record the template without a route object
+    path = getattr(route, "path", None) or scope.get("path_template")
+    if path:
+        return path
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_PATH
+    return _ENDPOINT_PATHS.get(endpoint, OTHER_PATH)
+
+
+def prime_metrics(app: Any) -> None:
+    """
+    Eagerly create label children for every declared (method, route) pair so the
+    request path only does dict lookups. Call once at startup, after routers are included.
+    """
+    for route in app.routes:
+        path = getattr(route, "path", None)
+        methods = getattr(route, "methods", None)
+        if not path or not methods:
+            continue
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is not None:
+            _ENDPOINT_PATHS.setdefault(endpoint, path)
+        for method in methods:
+            lat_key = (method, path)
+            cnt_key = (method, path, "200")
+            _LAT_CHILDREN.setdefault(lat_key, REQUEST_LATENCY.labels(*lat_key))
+            _CNT_CHILDREN.setdefault(cnt_key, REQUEST_COUNT.labels(*cnt_key))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: counts and times every HTTP request, labelled by route
+    template. The status is read from `http.response.start`; a request that raises
+    before responding is recorded as 500.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.monotonic_ns()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ns = time.monotonic_ns() - start
+
+            lat_key = (scope["method"], _route_template(scope))
+            cnt_key = (*lat_key, str(status_code))
+
+            counter = _CNT_CHILDREN.get(cnt_key)
+            if counter is None:
+                counter = _CNT_CHILDREN.setdefault(cnt_key, REQUEST_COUNT.labels(*cnt_key))
+            latency = _LAT_CHILDREN.get(lat_key)
+            if latency is None:
+                latency = _LAT_CHILDREN.setdefault(lat_key, REQUEST_LATENCY.labels(*lat_key))
 
-    # Label cardinality: avoid raw dynamic paths; you can normalize (e.g., /users/{id} -> /users/:id)
-    path = request.url.path
-    REQUEST_COUNT.labels(request.method, path, str(response.status_code)).inc()
-    REQUEST_LATENCY.labels(request.method, path).observe(elapsed)
-    return response
+            counter.inc()
+            latency.observe(elapsed_ns * 1e-9)
 
 # Expose /metrics response
 def metrics_response():
-    from fastapi import Response
+    """
+    Under Gunicorn each worker has its own registry. Set PROMETHEUS_MULTIPROC_DIR
+    (shared, emptied on deploy) to aggregate all workers in one scrape.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
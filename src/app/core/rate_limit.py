@@ -1,48 +1,59 @@
 from __future__ import annotations
 
-import os
+import sys
 from typing import Callable
 
 from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
+from app.core.config import get_settings
+
 # Prefer Redis for multi-process / multi-replica, fallback to memory
-# e.g. REDIS_URL=redis://localhost:6379/0
-REDIS_URL = os.getenv("REDIS_URL")
+# e.g. RATE_LIMIT_STORAGE_URL (or REDIS_URL)=redis://localhost:6379/0, read through
+# Settings so .env and the per-environment classes apply
+_settings = get_settings()
+REDIS_URL = _settings.rate_limit_storage_url or _settings.redis_url
 STORAGE_URI = REDIS_URL if REDIS_URL else "memory://"
 
+# Fixed window: on Redis each hit is one atomic INCR+EXPIRE Lua call (EVALSHA);
+# moving-window would keep a per-key list and cost more per check.
+STRATEGY = "fixed-window"
+
 def key_ip(request: Request) -> str:
     """
-    Robust IP extractor for proxies: use leftmost X-Forwarded-For, else client.host.
-    Adjust to your trust boundaries (e.g., only trust your ingress).
+    Client IP resolved once per request by ClientIPMiddleware (X-Real-IP /
+    leftmost X-Forwarded-For / peer); falls back to the socket peer.
     """
-    xff = request.headers.get("x-forwarded-for")
-    if xff:
-        return xff.split(",")[0].strip()
-    return get_remote_address(request)
+    return request.scope.get("client_ip") or get_remote_address(request)
+
+_USER_PREFIX = sys.intern("user:")
+_IP_PREFIX = sys.intern("ip:")
 
 def key_user_or_ip(request: Request) -> str:
     """
     User key when JWT middleware populates request.state.user; fallback to IP.
     """
     user = getattr(request.state, "user", None)
-    return f"user:{user}" if user else f"ip:{key_ip(request)}"
+    return _USER_PREFIX + str(user) if user else _IP_PREFIX + key_ip(request)
 
 # Create one Limiter instance and reuse it app-wide
 limiter = Limiter(
     key_func=key_ip,              # default key (IP)
     storage_uri=STORAGE_URI,      # Redis or memory
+    strategy=STRATEGY,
     headers_enabled=True,         # send standard rate-limit headers
 )
 
-# Exception handler for 429
+# Exception handler for 429 (the rejection path should stay cheap)
+_TOO_MANY = {"detail": "Too many requests, slow down."}
+
 def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Response:
-    from fastapi.responses import JSONResponse
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=429,
-        content={"detail": "Too many requests, slow down."},
+        content=_TOO_MANY,
         headers=getattr(exc, "headers", None) or {},
     )
 
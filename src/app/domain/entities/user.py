@@ -1,7 +1,7 @@
-from dataclasses import dataclass
+from typing import NamedTuple
 
-@dataclass(slots=True)
-class User:
+class User(NamedTuple):
+    """Immutable user entity; tuple layout keeps bulk lists compact."""
     id: int
     username: str
     email: str
@@ -6,7 +6,7 @@ from app.auth.ldap_client import ldap_bind
 from app.security.jwt import create_token
 from app.infrastructure.db.repositories.user_repo import UserRepository
 from app.schemas.auth import TokenResponse
-from app.utils.hp_py_logger import update_request_context
+from app.utils.hp_py_logger import hp_log, update_request_context
 
 class AuthService:
     """
@@ -26,23 +26,15 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
-        print(f"LDAP bind successful for user: {(username)}")
-        # 2️⃣ Fetch user record (and roles) from DB
-        user = await self.repo.get_by_id(username)
-        
-        print(f"User fetched from DB: {user}")  # Debugging line
-
+        hp_log.debug("LDAP bind successful for user %s", username)
+        # 2️⃣ Fetch user record and role names (single query on the username index)
+        user, role_names = await self.repo.get_user_with_roles(username)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        print(f":::::::::::::::::::-------User found: {user.username}----{getattr(user, "username", None)}" )
+
         update_request_context(user=username)
-        
-        # 3️⃣ Map Role objects → List[str]
-        #    user.roles is List[Role], so extract .name
-        role_names = [role.name for role in user.roles]
 
-        # 4  Issue JWT with subject and roles
+        # 3️⃣ Issue JWT with subject and roles
         token = create_token({
             "sub": user.username,
             "roles": role_names  # comma-separated or list, per your implementation
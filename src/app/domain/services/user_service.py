@@ -1,6 +1,6 @@
 # src/app/domain/services/user_service.py
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -18,23 +18,22 @@ class UserService:
         self.repo = UserRepository(session)
         self.current_user = current_user
 
-    async def list_users(self) -> List[UserRead]:
+    async def list_users(self) -> List[Dict[str, Any]]:
         """
-        Return all users in the system.
+        Return all users in the system, as plain dicts shaped like UserRead.
         """
         users = await self.repo.get_all_users()
-        output: List[UserRead] = []
-        for u in users:
-            output.append(
-                UserRead(
-                    id=u.id,
-                    username=u.username,
-                    full_name=u.full_name,
-                    email=u.email,
-                    roles=[role.name for role in u.roles] if u.roles else []
-                )
-            )
-        return output
+        # DB-sourced rows: skip per-row model construction (this list can be large)
+        return [
+            {
+                "id": u.id,
+                "username": u.username,
+                "full_name": u.full_name,
+                "email": u.email,
+                "roles": list(u.role_names),
+            }
+            for u in users
+        ]
 
     async def get_current_user(self) -> UserRead:
         """
@@ -72,7 +71,7 @@ class UserService:
             username=u.username,
             full_name=u.full_name,
             email=u.email,
-            roles=[role.name for role in u.roles] if u.roles else []
+            roles=list(u.role_names)
         )
 
     async def create_user(self, payload: UserCreate) -> UserRead:
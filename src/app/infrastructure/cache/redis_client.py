@@ -1,8 +1,34 @@
 import redis.asyncio as redis
-from functools import lru_cache
+from typing import Optional
 from app.core.config import get_settings
 
-@lru_cache
+# One pool per process, shared by every coroutine. redis-py resets a pool that
+# was inherited across fork(), so building it before Gunicorn forks is safe.
+_POOL: Optional[redis.ConnectionPool] = None
+_CLIENT: Optional[redis.Redis] = None
+
+
 def get_redis() -> redis.Redis:
-    settings = get_settings()
-    return redis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+    global _POOL, _CLIENT
+    if _CLIENT is None:
+        settings = get_settings()
+        _POOL = redis.ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_pool_size,
+            # callers treat RedisError (incl. TimeoutError) as a miss; don't let
+            # a slow Redis hold up the request path instead
+            socket_connect_timeout=settings.redis_connect_timeout,
+            socket_timeout=settings.redis_socket_timeout,
+            encoding="utf-8",
+            decode_responses=True,
+        )
+        _CLIENT = redis.Redis(connection_pool=_POOL)
+    return _CLIENT
+
+
+async def close_redis() -> None:
+    """Disconnect the shared pool (app shutdown)."""
+    global _POOL, _CLIENT
+    pool, _POOL, _CLIENT = _POOL, None, None
+    if pool is not None:
+        await pool.disconnect()
@@ -1,5 +1,6 @@
 # src/app/infrastructure/db/models/user.py
-from sqlalchemy import Column, Integer, String
+from typing import Tuple
+from sqlalchemy import Column, Integer, String, event
 from sqlalchemy.orm import relationship
 from app.infrastructure.db.base_class import Base
 from app.infrastructure.db.models.user_roles import user_roles
@@ -19,3 +20,22 @@ class User(Base):
         back_populates="users",
         lazy="selectin",
     )
+
+    @property
+    def role_names(self) -> Tuple[str, ...]:
+        """Role names as a tuple, built once and reset whenever `roles` changes or reloads."""
+        names = self.__dict__.get("_role_names")
+        if names is None:
+            names = tuple(role.name for role in self.roles)
+            self.__dict__["_role_names"] = names
+        return names
+
+
+def _reset_role_names(target: User, *args) -> None:
+    target.__dict__.pop("_role_names", None)
+
+
+for _evt in ("append", "remove", "bulk_replace"):
+    event.listen(User.roles, _evt, _reset_role_names)
+for _evt in ("refresh", "expire"):
+    event.listen(User, _evt, _reset_role_names)
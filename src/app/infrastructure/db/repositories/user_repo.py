@@ -1,14 +1,52 @@
 # src/app/infrastructure/db/repositories/user_repo.py
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Tuple
+from cachetools import TLRUCache
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.infrastructure.db.models.role import Role
 from app.infrastructure.db.models.user import User
 
+class UserSnapshot(NamedTuple):
+    """Scalar columns + role names of a User; plain data, safe to share across sessions."""
+    id: int
+    username: str
+    full_name: Optional[str]
+    email: Optional[str]
+    role_names: Tuple[str, ...]
+
+
+# username -> (snapshot, ttl) for the auth path. Entries refilled on a miss live
+# USER_CACHE_TTL; the startup preload (warm_user_cache) lives USER_CACHE_WARM_TTL
+# so it still covers the traffic ramp after a deploy. Mutations made through
+# this repository call invalidate_user(); anything else is bounded by the TTL.
+USER_CACHE_MAXSIZE = 2000
+USER_CACHE_TTL = 60  # seconds
+USER_CACHE_WARM_TTL = 900  # seconds
+_USER_CACHE: TLRUCache[str, Tuple[UserSnapshot, float]] = TLRUCache(
+    maxsize=USER_CACHE_MAXSIZE, ttu=lambda _key, value, now: now + value[1]
+)
+
+
+def invalidate_user(username: str) -> None:
+    """Drop the cached view of a user (call after create/update/delete or role changes)."""
+    _USER_CACHE.pop(username, None)
+
+
+def _remember(user: User, ttl: float = USER_CACHE_TTL) -> UserSnapshot:
+    snapshot = UserSnapshot(
+        id=user.id,
+        username=user.username,
+        full_name=user.full_name,
+        email=user.email,
+        role_names=tuple(user.role_names),
+    )
+    _USER_CACHE[user.username] = (snapshot, ttl)
+    return snapshot
+
 
 class UserRepository:
     """
@@ -29,27 +67,56 @@ class UserRepository:
     async def get_user_roles(self, username: str) -> list[str]:
         """
         Fetch just the role‐names (strings) for a given username.
+        Served from the user cache when possible.
         """
-        # simple approach: load the User, then extract role.name
-        user = await self.get_by_username(username)
-        if not user or not user.roles:
-            return []
-        return [role.name for role in user.roles]
+        _, role_names = await self.get_user_with_roles(username)
+        return role_names
+
+    async def get_user_with_roles(
+        self, username: str
+    ) -> Tuple[Optional[UserSnapshot], List[str]]:
+        """
+        Fetch a user snapshot and their role names in one round trip (LEFT JOIN on roles).
+        Served from the user cache when possible; a miss refreshes it.
+        """
+        hit = _USER_CACHE.get(username)
+        if hit is not None:
+            snapshot = hit[0]
+            return snapshot, list(snapshot.role_names)
+
+        stmt = select(User).options(joinedload(User.roles)).where(User.username == username)
+        result = await self.session.execute(stmt)
+        user = result.unique().scalar_one_or_none()
+        if not user:
+            return None, []
+        snapshot = _remember(user)
+        return snapshot, list(snapshot.role_names)
+
+    async def warm_user_cache(self, limit: int = USER_CACHE_MAXSIZE) -> int:
+        """
+        Preload up to `limit` users (newest first) into the user cache, with
+        USER_CACHE_WARM_TTL. There is no last-activity column, so recency of
+        creation stands in for it. Returns the number of users cached.
+        """
+        stmt = select(User).options(selectinload(User.roles)).order_by(User.id.desc()).limit(limit)
+        result = await self.session.execute(stmt)
+        users = result.scalars().all()
+        for user in users:
+            _remember(user, USER_CACHE_WARM_TTL)
+        return len(users)
 
     async def get_all_users(self) -> List[User]:
         """
         Return all users from the DB.
         """
-        result = await self.session.execute(select(User))
+        result = await self.session.execute(select(User).options(selectinload(User.roles)))
         return result.scalars().all()
 
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """
         Fetch a user by their primary key ID.
         """
-        print(f"Fetching user by ID: {user_id}")
-        stmt = select(User).where(User.id == int(user_id))
-        print(f"Executing statement: {stmt}")
+        stmt = select(User).options(selectinload(User.roles)).where(User.id == user_id)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
@@ -63,13 +130,20 @@ class UserRepository:
         # 1) Create the User without roles
         user = User(username=username, full_name=full_name, email=email)
 
-        # 2) For each requested role name, fetch the Role instance and append it
-        for name in role_names:
-            result = await self.session.execute(select(Role).where(Role.name == name))
-            role = result.scalars().first()
-            if not role:
-                raise HTTPException(status_code=400, detail=f"Role '{name}' not found")
-            user.roles.append(role)
+        # 2) Fetch all requested roles in one query and attach them
+        wanted = list(dict.fromkeys(role_names))  # de-dupe, keep order
+        if wanted:
+            result = await self.session.execute(select(Role).where(Role.name.in_(wanted)))
+            role_map = {role.name: role for role in result.scalars().all()}
+            missing = [name for name in wanted if name not in role_map]
+            if missing:
+                if len(missing) == 1:
+                    raise HTTPException(status_code=400, detail=f"Role '{missing[0]}' not found")
+                raise HTTPException(
+                    status_code=400,
+                    detail="Roles not found: " + ", ".join(f"'{name}'" for name in missing),
+                )
+            user.roles = [role_map[name] for name in wanted]
 
         self.session.add(user)
 
@@ -81,4 +155,6 @@ class UserRepository:
             await self.session.rollback()
             raise HTTPException(status_code=400, detail="Username already exists")
 
+        invalidate_user(username)
+
         return user
\ No newline at end of file
@@ -3,16 +3,20 @@ from __future__ import annotations
 
 import logging
 from contextlib import asynccontextmanager
-from ipaddress import ip_network, ip_address
 
 from fastapi import FastAPI, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.core.config import get_settings
-from app.core.observability import metrics_middleware, metrics_response
+from app.core.observability import MetricsMiddleware, metrics_response, prime_metrics
 from app.utils.hp_py_logger import init_logging, hp_log
 from app.utils.request_context_middleware import RequestContextMiddleware
 from app.auth.jwt_context_middleware import JWTContextMiddleware
+from app.core.metrics_guard import ip_in_allowlist, peer_ip
+from app.utils.client_ip_middleware import ClientIPMiddleware
+from app.infrastructure.cache.redis_client import close_redis
+from app.infrastructure.db.connections import SessionMain
+from app.infrastructure.db.repositories.user_repo import UserRepository
 
 # Rate limiting (SlowAPI)
 from slowapi.middleware import SlowAPIMiddleware
@@ -43,9 +47,18 @@ if settings.log_wire_sqlalchemy:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     hp_log.info("Application startup")
+    prime_metrics(app)
+    try:
+        async with SessionMain() as session:
+            warmed = await UserRepository(session).warm_user_cache()
+        hp_log.info("User cache warmed with %d users", warmed)
+    except Exception:
+        # A cold cache only costs a DB round trip per first lookup; never block startup.
+        hp_log.warning("User cache warm-up failed", exc_info=True)
     try:
         yield
     finally:
+        await close_redis()
         hp_log.info("Application shutdown")
 
 # ---------------------------------------------------------------------
@@ -56,6 +69,7 @@ app = FastAPI(
     version="0.1.0",
     debug=settings.debug,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # orjson: faster encode, bytes out directly
 )
 
 # If you run behind a reverse proxy (Nginx/Ingress), consider:
@@ -63,7 +77,8 @@ app = FastAPI(
 # app.add_middleware(ProxyHeadersMiddleware)  # trust X-Forwarded-* for correct client IP
 
 # ---------------------------------------------------------------------
-# 4) Middleware order: RequestContext → JWTContext → SlowAPI → metrics
+# 4) Middleware. add_middleware() wraps the stack, so the LAST one added is the
+#    outermost. Request order: Metrics → ClientIP → SlowAPI → JWTContext → RequestContext
 # ---------------------------------------------------------------------
 app.add_middleware(RequestContextMiddleware)
 app.add_middleware(JWTContextMiddleware)
@@ -73,15 +88,18 @@ app.add_middleware(SlowAPIMiddleware)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
+# Resolve the client IP once (consumed by SlowAPI key funcs and the /metrics IP guard)
+app.add_middleware(ClientIPMiddleware)
+
 # Rate limit error -> 429 JSON
-# from fastapi.responses import JSONResponse
+# from fastapi.responses import JSONResponse, ORJSONResponse
 # @app.exception_handler(RateLimitExceeded)
 # async def _rate_limit_exceeded_handler(request, exc):
 #     return JSONResponse(status_code=429, content={"detail": "Too many requests, slow down."})
 
 
-# Prometheus metrics middleware (your existing one)
-app.middleware("http")(metrics_middleware)
+# Prometheus metrics middleware (pure ASGI, outermost: times the whole stack)
+app.add_middleware(MetricsMiddleware)
 
 # ---------------------------------------------------------------------
 # 5) Routers
@@ -102,19 +120,6 @@ async def root():
 # ---------------------------------------------------------------------
 # 7) /metrics protection (open | role | ip_allow)
 # ---------------------------------------------------------------------
-def _ip_allowed(ip: str, allowed: list[str]) -> bool:
-    for item in allowed:
-        item = item.strip()
-        if not item:
-            continue
-        try:
-            if ip_address(ip) in ip_network(item, strict=False):
-                return True
-        except ValueError:
-            if ip == item:
-                return True
-    return False
-
 if settings.metrics_enabled:
     if settings.metrics_protect_mode == "open":
         @app.get(settings.metrics_path)
@@ -131,9 +136,8 @@ if settings.metrics_enabled:
     else:  # ip_allow (default)
         @app.get(settings.metrics_path)
         async def metrics_ip_guard(request: Request):
-            client_ip = (request.headers.get("x-real-ip")
-                         or request.headers.get("x-forwarded-for", "").split(",")[0].strip()
-                         or (request.client.host if request.client else "127.0.0.1"))
-            if not _ip_allowed(client_ip, settings.metrics_allow_ips):
+            # socket peer only: forwarded headers are client-controlled (see peer_ip)
+            client_ip = peer_ip(request.scope) or "127.0.0.1"
+            if not ip_in_allowlist(client_ip):
                 return JSONResponse(status_code=403, content={"detail": "Forbidden"})
             return metrics_response()
@@ -1,18 +1,23 @@
 # src/app/schemas/user.py
 
-from typing import List, Optional, Any
-from pydantic import BaseModel, field_validator
+from typing import FrozenSet, List, Optional, Any
+from pydantic import AliasChoices, BaseModel, Field, PrivateAttr, field_validator
 
 class UserRead(BaseModel):
     id: int
     username: str
     full_name: Optional[str]
     email: Optional[str]
-    roles: List[str]
+    # from ORM objects, prefer the precomputed User.role_names over Role instances
+    roles: List[str] = Field(validation_alias=AliasChoices("role_names", "roles"))
+
+    # normalized (stripped, lower-cased) roles; filled lazily by role guards
+    _roles_norm: Optional[FrozenSet[str]] = PrivateAttr(default=None)
 
-    # enable .from_orm()
+    # enable .from_orm(); frozen: read-only DTO (instances are shared via the token cache)
     model_config = {
         "from_attributes": True,
+        "frozen": True,
     }
 
     @field_validator("roles", mode="before")
@@ -22,15 +27,13 @@ class UserRead(BaseModel):
         If we got a list of Role objects, return [r.name for r in v].
         Otherwise (already List[str]) just return it.
         """
-        if isinstance(v, list):
-            unpacked = []
-            for item in v:
-                # SQLAlchemy relationship gives Role instances
-                if hasattr(item, "name"):
-                    unpacked.append(item.name)
-                else:
-                    unpacked.append(item)
-            return unpacked
+        tv = type(v)
+        # fast path: already names (the common case, e.g. User.role_names)
+        if (tv is list or tv is tuple) and (not v or type(v[0]) is str):
+            return v
+        if isinstance(v, (list, tuple)):
+            # SQLAlchemy relationship gives Role instances (InstrumentedList)
+            return [getattr(item, "name", item) for item in v]
         return v  # let pydantic handle other cases
 
 class UserCreate(BaseModel):
@@ -1,23 +1,86 @@
 # src/app/security/jwt.py
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Sequence, Union
+import hashlib
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
+from cachetools import TTLCache
 from fastapi import HTTPException, status
-from jose import jwt
+import jwt
+import orjson
+from jwt.exceptions import (
+    ExpiredSignatureError,
+    ImmatureSignatureError,
+    InvalidAudienceError,
+    InvalidIssuedAtError,
+    InvalidIssuerError,
+    InvalidTokenError,
+    MissingRequiredClaimError,
+)
 
-# Import exceptions from the correct module. Fallback to JWTError-only if needed.
-try:
-    from jose.exceptions import JWTError, ExpiredSignatureError, JWTClaimsError  # type: ignore
-except Exception:  # pragma: no cover
-    from jose.exceptions import JWTError  # type: ignore
-    ExpiredSignatureError = JWTError     # fallback
-    JWTClaimsError = JWTError            # fallback
+from app.core.config import get_settings
 
-from zoneinfo import ZoneInfo
+# Claim-level failures (iss/aud/nbf/iat/required) -> "Invalid token claims"
+_CLAIMS_ERRORS = (
+    ImmatureSignatureError,
+    InvalidAudienceError,
+    InvalidIssuedAtError,
+    InvalidIssuerError,
+    MissingRequiredClaimError,
+)
+
+# Verified payloads keyed by a digest of the full token (never by `sub`, so a
+# tampered token can't hit). Entries live <= 60s and are never served past the
+# token's own `exp`; iss/aud expectations are re-checked on every hit.
+# Each entry keeps the payload plus its JSON bytes: hits return a fresh
+# orjson.loads() copy, so nested claims (e.g. `roles`) are never shared.
+# TTLCache isn't thread-safe and decode_token may run in the threadpool.
+_DECODE_CACHE: TTLCache[bytes, Tuple[Dict[str, Any], bytes]] = TTLCache(maxsize=10_000, ttl=60)
+_DECODE_LOCK = threading.Lock()
+
+
+# Signed tokens for identical claims within the same 10s window, so repeat issues
+# skip JSON encoding + HMAC. A hit carries the iat/exp of the first issue in that
+# window, i.e. at most 10s less lifetime than a fresh signature.
+_SIGN_WINDOW_SECONDS = 10
+_SIGN_CACHE: TTLCache[Tuple[Any, ...], str] = TTLCache(maxsize=2048, ttl=_SIGN_WINDOW_SECONDS)
+_SIGN_LOCK = threading.Lock()
+
+
+def _claims_key(claims: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Canonical JSON of `claims` (sorted keys), so equal keys mean equal encoded
+    claims at any depth (True/1/1.0 stay apart). None if orjson can't encode them.
+    """
+    try:
+        return orjson.dumps(claims, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        return None
+
+
+def _cache_key(token: str) -> bytes:
+    # blake2b is only a compact lookup key here; the signature was verified on insert
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
 
-from app.core.config import get_settings
+
+def _claims_match(
+    payload: Dict[str, Any],
+    expected_issuer: Optional[str],
+    verify_aud: bool,
+    expected_audience: Optional[str],
+) -> bool:
+    """Cheap iss/aud check for a cached payload; a mismatch falls back to a full decode."""
+    if expected_issuer is not None and payload.get("iss") != expected_issuer:
+        return False
+    if verify_aud:
+        aud = payload.get("aud")
+        auds = [aud] if isinstance(aud, str) else (aud or [])
+        if expected_audience not in auds:
+            return False
+    return True
 
 
 # ---- Helpers -----------------------------------------------------------------
@@ -26,9 +89,16 @@ def _settings():
     return get_settings()
 
 
+# Settings are immutable after startup: resolve the per-token constants once
+_ALG: str = _settings().jwt_algorithm
+_EXPIRY_SECONDS: int = _settings().token_expiry_minutes * 60
+
+
+@lru_cache(maxsize=1)
 def _get_signing_key() -> str:
     """
     HS* algorithms require a raw shared secret (bytes/str), not a SecretStr object.
+    Settings are immutable after startup, so this is resolved once.
     """
     key = _settings().secret_key.get_secret_value()
     if not key or not isinstance(key, str):
@@ -36,9 +106,11 @@ def _get_signing_key() -> str:
     return key
 
 
-def _get_algorithms() -> List[str]:
-    alg = _settings().jwt_algorithm
-    return [alg] if isinstance(alg, str) else list(alg)
+@lru_cache(maxsize=1)
+def _get_algorithms() -> Tuple[str, ...]:
+    # tuple: the cached value is shared by every decode, so keep it immutable
+    alg = _ALG
+    return (alg,) if isinstance(alg, str) else tuple(alg)
 
 
 # ---- Public API ---------------------------------------------------------------
@@ -53,19 +125,23 @@ def create_token(
     Create a signed JWT.
 
     - `claims` should at least include a subject: e.g. {"sub": "username"}.
-    - `exp` is added automatically using configured timezone.
+    - `iat`/`exp` are added automatically (epoch seconds; timezone-independent).
     - Optional `iss` and `aud` can be set here or enforced at decode time.
     """
-    settings = _settings()
-    tz = ZoneInfo(settings.timezone)  # ex: "Asia/Kolkata"
-    now = datetime.now(tz)
+    now = int(time.time())
+    lifetime = expires_in_minutes * 60 if expires_in_minutes else _EXPIRY_SECONDS
 
-    exp_minutes = expires_in_minutes or settings.token_expiry_minutes
-    expire = now + timedelta(minutes=exp_minutes)
+    claims_key = _claims_key(claims)
+    if claims_key is not None:
+        sign_key = (claims_key, lifetime, issuer, audience, now // _SIGN_WINDOW_SECONDS)
+        with _SIGN_LOCK:
+            cached = _SIGN_CACHE.get(sign_key)
+        if cached is not None:
+            return cached
 
     to_encode: Dict[str, Any] = {**claims}
-    to_encode["iat"] = int(now.timestamp())
-    to_encode["exp"] = int(expire.timestamp())
+    to_encode["iat"] = now
+    to_encode["exp"] = now + lifetime
     if issuer:
         to_encode["iss"] = issuer
     if audience:
@@ -74,8 +150,11 @@ def create_token(
     token = jwt.encode(
         to_encode,
         _get_signing_key(),
-        algorithm=_settings().jwt_algorithm,
+        algorithm=_ALG,
     )
+    if claims_key is not None:
+        with _SIGN_LOCK:
+            _SIGN_CACHE[sign_key] = token
     return token
 
 
@@ -95,14 +174,29 @@ def decode_token(
     - `expected_issuer`: check `iss` claim if provided
     - `expected_audience`: required if `verify_aud=True`
     - `leeway_seconds`: clock skew allowance
+
+    Repeat decodes of the same token are served from a short-lived cache
+    without re-verifying the signature (a deep copy is returned, so callers
+    may mutate it). Only used with `verify_exp`, since `exp` bounds the entry.
     """
+    cacheable = verify_exp
+    if cacheable:
+        key = _cache_key(token)
+        with _DECODE_LOCK:
+            hit = _DECODE_CACHE.get(key)
+        if hit is not None:
+            cached, raw = hit
+            if cached["exp"] > time.time() and _claims_match(
+                cached, expected_issuer, verify_aud, expected_audience
+            ):
+                return orjson.loads(raw)
+
     try:
         options = {
             "verify_exp": verify_exp,
-            # We'll pass `audience` parameter below only when verify_aud=True;
-            # `python-jose` uses that to trigger aud validation.
+            # `audience` is only passed below when verify_aud=True
             "verify_aud": verify_aud,
-            "leeway": leeway_seconds,
+            "require": ["exp"] if verify_exp else [],
         }
 
         decoded = jwt.decode(
@@ -112,9 +206,19 @@ def decode_token(
             options=options,
             audience=expected_audience if verify_aud else None,
             issuer=expected_issuer,
+            leeway=leeway_seconds,
         )
-        # Note: If you pass issuer/audience, jose will raise JWTClaimsError on mismatch.
-
+        # Note: If you pass issuer/audience, PyJWT raises InvalidIssuer/AudienceError on mismatch.
+
+        if cacheable:
+            try:
+                raw = orjson.dumps(decoded)
+            except orjson.JSONEncodeError:
+                # e.g. integers beyond 64 bits: valid JSON, just not cacheable
+                return decoded
+            with _DECODE_LOCK:
+                _DECODE_CACHE[key] = (decoded, raw)
+            return orjson.loads(raw)
         return decoded
 
     except ExpiredSignatureError:
@@ -124,14 +228,14 @@ def decode_token(
             detail="Token expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except JWTClaimsError as exc:
+    except _CLAIMS_ERRORS as exc:
         # Missing / mismatched claims (iss/aud/nbf, etc.)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token claims: {exc}",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except JWTError:
+    except InvalidTokenError:
         # Bad signature, malformed token, wrong key/alg, etc.
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,49 @@
+# src/app/utils/client_ip_middleware.py
+from __future__ import annotations
+
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# scope key read by rate limiting (key_ip) and logging; header-derived, so never
+# use it for access control (the /metrics guard uses the socket peer)
+SCOPE_KEY = "client_ip"
+
+
+def resolve_client_ip(scope: Scope) -> Optional[str]:
+    """
+    X-Real-IP, else leftmost X-Forwarded-For, else the socket peer.
+    Adjust to your trust boundaries (e.g., only trust your ingress).
+    """
+    real_ip = xff = None
+    for key, value in scope["headers"]:
+        if key == b"x-real-ip":
+            real_ip = value
+        elif key == b"x-forwarded-for":
+            xff = value
+
+    if real_ip:
+        ip = real_ip.strip().decode("latin-1")
+        if ip:
+            return ip
+    if xff:
+        # only the leftmost hop is used: partition stops at the first comma
+        ip = xff.partition(b",")[0].strip().decode("latin-1")
+        if ip:
+            return ip
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+class ClientIPMiddleware:
+    """
+    Resolve the client IP once per request and store it in scope["client_ip"],
+    so proxy headers are parsed in one place instead of by every consumer.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            scope[SCOPE_KEY] = resolve_client_ip(scope)
+        await self.app(scope, receive, send)
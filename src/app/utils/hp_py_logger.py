@@ -17,13 +17,11 @@ Usage:
 from __future__ import annotations
 
 import atexit
-import json
 import logging
 import os
 import queue
 import socket
 import threading
-import time
 from datetime import datetime, timezone
 from logging.handlers import (
     QueueHandler,
@@ -31,33 +29,63 @@ from logging.handlers import (
     RotatingFileHandler,
     WatchedFileHandler,
 )
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import orjson
 
 # ---------- contextvars ----------
 import contextvars
 
-_REQUEST_CTX: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar(
-    "request_ctx", default={}
-)
+# One ContextVar per field: setting a field is a single C-level set, with no
+# dict copy/merge per request.
+_CTX_REQUEST_ID: contextvars.ContextVar[Any] = contextvars.ContextVar("log_request_id", default=None)
+_CTX_USER: contextvars.ContextVar[Any] = contextvars.ContextVar("log_user", default=None)
+_CTX_METHOD: contextvars.ContextVar[Any] = contextvars.ContextVar("log_method", default=None)
+_CTX_PATH: contextvars.ContextVar[Any] = contextvars.ContextVar("log_path", default=None)
+_CTX_IP: contextvars.ContextVar[Any] = contextvars.ContextVar("log_ip", default=None)
+
+_CTX_VARS: Dict[str, contextvars.ContextVar[Any]] = {
+    "request_id": _CTX_REQUEST_ID,
+    "user": _CTX_USER,
+    "method": _CTX_METHOD,
+    "path": _CTX_PATH,
+    "ip": _CTX_IP,
+}
+_CTX_ITEMS = tuple(_CTX_VARS.items())
+
+CONTEXT_KEYS = tuple(_CTX_VARS)
+
+# Process-wide constants stamped on every record
+_ENV = os.getenv("ENVIRONMENT", "dev")
+_SERVICE = os.getenv("SERVICE_NAME", "app")
+_HOST = socket.gethostname()
+
 
-CONTEXT_KEYS = ("request_id", "user", "method", "path", "ip")
+_CtxTokens = List[Tuple[contextvars.ContextVar[Any], contextvars.Token[Any]]]
 
 
-def set_request_context(**kwargs) -> None:
+def set_request_context(**kwargs) -> _CtxTokens:
     """
-    Merge key/value pairs into the current request context.
+    Set request context fields (only CONTEXT_KEYS are attached to records).
     Call this in middleware (request_id/method/path/ip) and once the user is known.
+    Returns the tokens to hand to `reset_request_context` when the request ends.
     """
-    ctx = {**_REQUEST_CTX.get(), **kwargs}
-    _REQUEST_CTX.set(ctx)
+    tokens: _CtxTokens = []
+    for key, val in kwargs.items():
+        var = _CTX_VARS.get(key)
+        if var is not None:
+            tokens.append((var, var.set(val)))
+    return tokens
 
 
 def update_request_context(**kwargs) -> None:
     set_request_context(**kwargs)
 
 
-def clear_request_context() -> None:
-    _REQUEST_CTX.set({})
+def reset_request_context(tokens: _CtxTokens) -> None:
+    """Restore the fields set by `set_request_context` to their previous values."""
+    for var, token in reversed(tokens):
+        var.reset(token)
 
 
 # ---------- LogRecord factory (binds context in the request thread) ----------
@@ -75,22 +103,22 @@ def _install_record_factory() -> None:
         record = old_factory(*args, **kwargs)
 
         # copy request context (snapshot) into record
-        ctx = _REQUEST_CTX.get() or {}
-        for key in CONTEXT_KEYS:
-            val = ctx.get(key)
+        for key, var in _CTX_ITEMS:
+            val = var.get()
             if val is not None:
                 setattr(record, key, val)
             else:
                 # ensure attribute exists for formatters
                 setattr(record, key, getattr(record, key, None))
 
-        # stable attributes
-        if not hasattr(record, "env"):
-            record.env = os.getenv("ENVIRONMENT", "dev")
-        if not hasattr(record, "service"):
-            record.service = os.getenv("SERVICE_NAME", "app")
-        if not hasattr(record, "host"):
-            record.host = socket.gethostname()
+        # stable attributes (resolved once at import)
+        record.env = _ENV
+        record.service = _SERVICE
+        record.host = _HOST
+
+        # ISO timestamp in the pipeline tz, built lazily by the first sink that
+        # needs it and reused by the rest (see _shared_iso)
+        record._iso_ts = None
 
         return record
 
@@ -98,14 +126,64 @@ def _install_record_factory() -> None:
 
 
 # ---------- formatting ----------
+class _TimestampCache:
+    """
+    Formats record timestamps in a fixed tz, building the date/time part only
+    once per second; records within the same second just append the fraction.
+    """
+
+    __slots__ = ("tz", "_last")
+
+    def __init__(self, tz: datetime.tzinfo):
+        self.tz = tz
+        self._last: tuple[int, str, str, str] = (-1, "", "", "")
+
+    def _parts(self, created: float) -> tuple[int, str, str, str]:
+        sec = int(created)
+        last = self._last
+        if last[0] != sec:
+            dt = datetime.fromtimestamp(sec, tz=self.tz)
+            # (second, ISO date+time, asctime-style date+time, "+HH:MM" offset)
+            last = self._last = (
+                sec,
+                dt.strftime("%Y-%m-%dT%H:%M:%S"),
+                dt.strftime("%Y-%m-%d %H:%M:%S"),
+                dt.isoformat()[19:],
+            )
+        return last
+
+    def iso(self, created: float) -> str:
+        sec, head, _, offset = self._parts(created)
+        return f"{head}.{int((created - sec) * 1_000_000):06d}{offset}"
+
+    def asctime(self, record: logging.LogRecord) -> str:
+        return f"{self._parts(record.created)[2]},{int(record.msecs):03d}"
+
+
+# Pipeline timezone, set by init_logging; every JSON sink formats in it
+_TZ: datetime.tzinfo = timezone.utc
+_SHARED_TS = _TimestampCache(_TZ)
+
+
+def _shared_iso(record: logging.LogRecord) -> str:
+    """ISO timestamp in _TZ, computed once per record however many sinks emit it."""
+    ts = getattr(record, "_iso_ts", None)
+    if ts is None:
+        ts = record._iso_ts = _SHARED_TS.iso(record.created)
+    return ts
+
+
 class JSONFormatter(logging.Formatter):
     def __init__(self, tz: datetime.tzinfo | None = None):
         super().__init__()
         self.tz = tz or timezone.utc
+        # process-wide fields, identical on every record
+        self._static = {"env": _ENV, "service": _SERVICE, "host": _HOST}
 
     def format(self, record: logging.LogRecord) -> str:
         payload = {
-            "ts": datetime.fromtimestamp(record.created, tz=self.tz).isoformat(),
+            # orjson serializes datetimes natively (RFC 3339, same as isoformat())
+            "ts": _shared_iso(record) if self.tz is _TZ else datetime.fromtimestamp(record.created, tz=self.tz),
             "level": record.levelname,
             "name": record.name,
             "msg": record.getMessage(),
@@ -120,13 +198,12 @@ class JSONFormatter(logging.Formatter):
             "method": getattr(record, "method", None),
             "path": getattr(record, "path", None),
             "ip": getattr(record, "ip", None),
-            "env": getattr(record, "env", None),
-            "service": getattr(record, "service", None),
-            "host": getattr(record, "host", None),
+            **self._static,
         }
         if record.exc_info:
             payload["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(payload, ensure_ascii=False)
+        # default=str: never drop a record over an odd context value
+        return orjson.dumps(payload, default=str).decode("utf-8")
 
 
 class PlainFormatter(logging.Formatter):
@@ -138,6 +215,29 @@ class PlainFormatter(logging.Formatter):
     def __init__(self, tz: datetime.tzinfo | None = None, fmt: Optional[str] = None):
         super().__init__(fmt or self.default_fmt)
         self.tz = tz or timezone.utc
+        self._ts = _TimestampCache(self.tz)
+        self._fast = fmt is None or fmt == self.default_fmt
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not self._fast:
+            return super().format(record)
+        # default_fmt assembled directly; the record factory guarantees the context attrs
+        s = (
+            f"{self.formatTime(record)} | {record.levelname} | {record.name} | {record.getMessage()} "
+            f"| req={record.request_id} user={record.user} {record.method} {record.path} ip={record.ip}"
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            s = f"{s}\n{record.exc_text}"
+        if record.stack_info:
+            s = f"{s}\n{self.formatStack(record.stack_info)}"
+        return s
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        return self._ts.asctime(record)
 
 
 # ---------- utility filters ----------
@@ -153,13 +253,19 @@ class ExcludePathsFilter(logging.Filter):
 
     def __init__(self, patterns: Sequence[str]):
         super().__init__()
-        self._patterns = [p for p in patterns if p]
+        self._patterns = tuple(p for p in patterns if p)
+        # whole paths (the usual /health, /metrics) are answered by one set lookup
+        self._exact = frozenset(p for p in self._patterns if p.startswith("/") and "*" not in p)
 
     def filter(self, record: logging.LogRecord) -> bool:
-        msg = record.getMessage()
         path = getattr(record, "path", None)
-        has = lambda s: (s in msg) or (path and s in path)
-        return not any(has(p) for p in self._patterns)
+        if path in self._exact:
+            return False
+        if path and any(p in path for p in self._patterns):
+            return False
+        # only now pay for %-formatting (uvicorn access lines carry the path in the message)
+        msg = record.getMessage()
+        return not any(p in msg for p in self._patterns)
 
 
 # ---------- optional sinks ----------
@@ -180,6 +286,19 @@ class LokiHTTPHandler(logging.Handler):
             self._requests = requests
         except Exception as e:
             raise RuntimeError("requests is required for LokiHTTPHandler") from e
+        self._session = self._new_session()
+
+    def _new_session(self):
+        # one keep-alive connection pool instead of a new TCP/TLS handshake per record
+        session = self._requests.Session()
+        adapter = self._requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _after_fork(self) -> None:
+        # pooled sockets inherited from the parent must not be shared
+        self._session = self._new_session()
 
     def _parse_labels(self, labels: str) -> Dict[str, str]:
         lab: Dict[str, str] = {}
@@ -196,7 +315,7 @@ class LokiHTTPHandler(logging.Handler):
             line = self.format(record)
             ts_ns = str(int(record.created * 1e9))  # Loki expects ns epoch
             streams = [{"stream": self.labels, "values": [[ts_ns, line]]}]
-            resp = self._requests.post(
+            resp = self._session.post(
                 self.url, json={"streams": streams}, timeout=self.timeout_s
             )
             if resp.status_code >= 400:
@@ -205,13 +324,77 @@ class LokiHTTPHandler(logging.Handler):
         except Exception:
             pass
 
+    def close(self) -> None:
+        try:
+            session = getattr(self, "_session", None)  # absent if __init__ failed
+            if session is not None:
+                session.close()
+        finally:
+            super().close()
+
+
+class _BackgroundFlushHandler(logging.Handler):
+    """
+    Base for batching sinks: emit() only appends to an in-memory buffer under
+    `_lock`, and a daemon thread calls `_flush()` every `flush_secs`, or early
+    once emit() sets `_wake`. Subclasses provide `_reset_buffer()` and `_flush()`
+    (swap the buffer out under the lock, then write it without holding it).
+    """
+
+    flusher_name = "log-flush"
+    flush_secs: float
+
+    def _reset_buffer(self) -> None:
+        raise NotImplementedError
+
+    def _flush(self) -> None:
+        raise NotImplementedError
+
+    def _init_flusher(self) -> None:
+        self._lock = threading.Lock()
+        self._reset_buffer()
+        self._start_flusher()
+
+    def _start_flusher(self) -> None:
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=self.flusher_name, daemon=True)
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        # the flusher thread (and possibly a held lock) don't survive fork();
+        # whatever the parent buffered is the parent's to write
+        self._init_flusher()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_secs)
+            self._wake.clear()
+            self._flush()
+
+    def close(self) -> None:
+        try:
+            thread = getattr(self, "_thread", None)  # absent if __init__ failed
+            if thread is not None:
+                self._stop.set()
+                self._wake.set()
+                thread.join(timeout=self.flush_secs + 5)
+                self._flush()
+        finally:
+            super().close()
+
 
-class DBHandler(logging.Handler):
+class DBHandler(_BackgroundFlushHandler):
     """
     Insert log lines into a relational DB table.
     Use only when required; otherwise ship JSON logs to ELK/Loki.
+
+    Rows are batched and written by the flusher thread with one executemany
+    per transaction instead of a commit per record.
     """
 
+    flusher_name = "db-log-flush"
+
     DDL = """
     CREATE TABLE IF NOT EXISTS {table} (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -230,7 +413,19 @@ class DBHandler(logging.Handler):
     )
     """
 
-    def __init__(self, url: str, table: str = "app_logs", level=logging.INFO):
+    COLUMNS = (
+        "ts", "level", "logger", "message", "request_id", "user",
+        "method", "path", "ip", "env", "service", "host",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        table: str = "app_logs",
+        level=logging.INFO,
+        flush_rows: int = 200,
+        flush_secs: float = 2.0,
+    ):
         super().__init__(level=level)
         try:
             from sqlalchemy import create_engine, text
@@ -240,14 +435,36 @@ class DBHandler(logging.Handler):
             raise RuntimeError("SQLAlchemy is required for DBHandler") from e
         self.url = url
         self.table = table
+        self.flush_rows = flush_rows
+        self.flush_secs = flush_secs
         self.engine = self._create_engine(self.url)
         with self.engine.begin() as conn:
             conn.execute(self._text(self.DDL.format(table=self.table)))
+        cols = ",".join(self.COLUMNS)
+        vals = ",".join(f":{k}" for k in self.COLUMNS)
+        self._stmt = self._text(f"INSERT INTO {self.table} ({cols}) VALUES ({vals})")
+
+        self._ts = _TimestampCache(timezone.utc)
+        self._init_flusher()
+
+    def _reset_buffer(self) -> None:
+        self._buf: List[Dict[str, Any]] = []
+
+    def _flush(self) -> None:
+        with self._lock:
+            if not self._buf:
+                return
+            batch, self._buf = self._buf, []
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(self._stmt, batch)
+        except Exception:
+            pass
 
     def emit(self, record: logging.LogRecord) -> None:
         try:
             payload = {
-                "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+                "ts": _shared_iso(record) if _TZ is timezone.utc else self._ts.iso(record.created),
                 "level": record.levelname,
                 "logger": record.name,
                 "message": record.getMessage(),
@@ -260,21 +477,26 @@ class DBHandler(logging.Handler):
                 "service": getattr(record, "service", None),
                 "host": getattr(record, "host", None),
             }
-            cols = ",".join(payload.keys())
-            vals = ",".join([f":{k}" for k in payload.keys()])
-            sql = f"INSERT INTO {self.table} ({cols}) VALUES ({vals})"
-            with self.engine.begin() as conn:
-                conn.execute(self._text(sql), payload)
+            with self._lock:
+                self._buf.append(payload)
+                full = len(self._buf) >= self.flush_rows
+            if full:
+                self._wake.set()
         except Exception:
             pass
 
 
-class MinioBatchHandler(logging.Handler):
+class MinioBatchHandler(_BackgroundFlushHandler):
     """
     Buffer JSONL lines in memory and periodically flush as an object to MinIO.
     Object key: logs/{service}/{YYYY}/{MM}/{DD}/{HH}/batch-{pid}-{seq}.jsonl
+
+    Uploads run on a background flusher thread (every `flush_secs`, or early once
+    `flush_lines` are buffered); emit() only appends, so a slow PUT never stalls logging.
     """
 
+    flusher_name = "minio-log-flush"
+
     def __init__(
         self,
         endpoint: str,
@@ -298,8 +520,6 @@ class MinioBatchHandler(logging.Handler):
         self.bucket = bucket
         self.flush_lines = flush_lines
         self.flush_secs = flush_secs
-        self._buf: List[str] = []
-        self._last_flush = time.time()
         self._seq = 0
         self._service = os.getenv("SERVICE_NAME", "app")
         self._pid = os.getpid()
@@ -308,19 +528,29 @@ class MinioBatchHandler(logging.Handler):
                 self.client.make_bucket(self.bucket)
         except Exception:
             pass
-        self._lock = threading.Lock()
+        self._init_flusher()
+
+    def _reset_buffer(self) -> None:
+        # encoded JSONL bytes; appended in place, no join/encode pass at flush
+        self._buf = bytearray()
+        self._buf_lines = 0
+
+    def _after_fork(self) -> None:
+        self._pid = os.getpid()  # object keys carry the writer's pid
+        super()._after_fork()
 
     def _object_key(self) -> str:
         now = datetime.utcnow()
         return f"logs/{self._service}/{now:%Y/%m/%d/%H}/batch-{self._pid}-{self._seq}.jsonl"
 
-    def _should_flush(self) -> bool:
-        return len(self._buf) >= self.flush_lines or (time.time() - self._last_flush) >= self.flush_secs
-
-    def _flush_locked(self):
-        if not self._buf:
-            return
-        data = ("\n".join(self._buf) + "\n").encode("utf-8")
+    def _flush(self) -> None:
+        # swap the buffer out under the lock; upload without holding it
+        with self._lock:
+            if not self._buf:
+                return
+            data = bytes(self._buf)  # BytesIO shares an immutable bytes object without copying
+            self._buf.clear()
+            self._buf_lines = 0
         key = self._object_key()
         try:
             from io import BytesIO
@@ -328,38 +558,37 @@ class MinioBatchHandler(logging.Handler):
                 self.bucket, key, BytesIO(data), length=len(data), content_type="application/json"
             )
             self._seq += 1
-            self._buf.clear()
-            self._last_flush = time.time()
         except Exception:
-            self._buf.clear()
-            self._last_flush = time.time()
+            pass
 
     def emit(self, record: logging.LogRecord) -> None:
         try:
             line = self.format(record)
             with self._lock:
-                self._buf.append(line)
-                if self._should_flush():
-                    self._flush_locked()
+                self._buf += line.encode("utf-8")
+                self._buf += b"\n"
+                self._buf_lines += 1
+                full = self._buf_lines >= self.flush_lines
+            if full:
+                self._wake.set()
         except Exception:
             pass
 
-    def close(self) -> None:
-        try:
-            with self._lock:
-                self._flush_locked()
-        finally:
-            super().close()
-
 
 # ---------- builder ----------
 hp_log = logging.getLogger("app")
 
 
 class _ListenerBundle:
-    def __init__(self, listener: QueueListener, handlers: List[logging.Handler]):
+    def __init__(
+        self,
+        listener: QueueListener,
+        handlers: List[logging.Handler],
+        queue_handler: Optional[QueueHandler] = None,
+    ):
         self.listener = listener
         self.handlers = handlers
+        self.queue_handler = queue_handler
 
 
 _listener_bundle: Optional[_ListenerBundle] = None
@@ -375,7 +604,7 @@ def init_logging(
     Initialize the logging system ONCE.
     Prefer passing a Settings object (from app.core.config).
     """
-    global _listener_bundle
+    global _listener_bundle, _TZ, _SHARED_TS
 
     if getattr(logging, "_hp_logger_installed", False):
         return hp_log
@@ -449,6 +678,10 @@ def init_logging(
         tz = ZoneInfo(tz_name)
     except Exception:
         tz = timezone.utc
+    if getattr(tz, "key", None) in ("UTC", "Etc/UTC"):
+        # same offsets; lets the UTC-only DB sink share the per-record timestamp
+        tz = timezone.utc
+    _TZ, _SHARED_TS = tz, _TimestampCache(tz)
 
     root_level = getattr(logging, defaults["level"].upper(), logging.INFO)
     fmt = defaults["format"]
@@ -554,8 +787,10 @@ def init_logging(
     listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
     listener.start()
 
-    _listener_bundle = _ListenerBundle(listener, handlers)
+    _listener_bundle = _ListenerBundle(listener, handlers, qh)
     atexit.register(_shutdown_logging)
+    # e.g. Gunicorn preload_app: the listener thread does not survive fork()
+    os.register_at_fork(after_in_child=_restart_logging_after_fork)
 
     # Let third-party loggers propagate to root; control their levels if desired
     for noisy in ("uvicorn.error", "uvicorn.access", "hypercorn.error", "hypercorn.access", "sqlalchemy.pool"):
@@ -569,6 +804,27 @@ def init_logging(
     return logging.getLogger("app")
 
 
+def _restart_logging_after_fork() -> None:
+    """Restart the queue listener (and drop inherited DB connections) in a forked child."""
+    if _listener_bundle is None:
+        return
+    for h in _listener_bundle.handlers:
+        engine = getattr(h, "engine", None)
+        if engine is not None:
+            engine.dispose(close=False)
+        after_fork = getattr(h, "_after_fork", None)
+        if after_fork is not None:
+            after_fork()
+    # fresh queue: the inherited one still references the parent's (dead) waiter
+    fresh: queue.Queue = queue.Queue(-1)
+    if _listener_bundle.queue_handler is not None:
+        _listener_bundle.queue_handler.queue = fresh
+    listener = _listener_bundle.listener
+    listener.queue = fresh
+    listener._thread = None
+    listener.start()
+
+
 def _shutdown_logging():
     global _listener_bundle
     try:
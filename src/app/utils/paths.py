@@ -1,11 +1,14 @@
+from functools import lru_cache
 from pathlib import Path
 
 FILE = Path(__file__).resolve()
 APP_ROOT = FILE.parents[1]
 PROJECT_ROOT = FILE.parents[2]
 
+@lru_cache(maxsize=128)
 def in_project(*parts: str) -> Path:
     return PROJECT_ROOT.joinpath(*parts)
 
+@lru_cache(maxsize=128)
 def in_app(*parts: str) -> Path:
     return APP_ROOT.joinpath(*parts)
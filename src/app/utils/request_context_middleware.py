@@ -1,41 +1,57 @@
 # src/app/utils/request_context_middleware.py
 from __future__ import annotations
 
-import uuid
-from typing import Callable
+import secrets
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.utils.hp_py_logger import set_request_context, clear_request_context
+from app.utils.hp_py_logger import reset_request_context, set_request_context
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
+class RequestContextMiddleware:
     """
     Adds per-request context:
       request_id, method, path, ip
-    and clears the context after response.
+    echoes the request id as an X-Request-ID response header,
+    and restores the previous context after response.
+
+    Plain ASGI middleware (no BaseHTTPMiddleware task/stream per request).
     """
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        raw_id = None
+        for key, value in scope["headers"]:
+            if key == b"x-request-id":
+                raw_id = value
+                break
+        if raw_id:
+            req_id = raw_id.decode("latin-1")
+        else:
+            # 128-bit random hex id; cheaper than building a uuid.UUID per request
+            req_id = secrets.token_hex(16)
+            raw_id = req_id.encode("latin-1")
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # propagate request id to response too (handy for tracing)
+                message["headers"] = [*message.get("headers", ()), (b"x-request-id", raw_id)]
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next: Callable):
+        client = scope.get("client")
+        # `user` is left alone: JWTContextMiddleware (outside this one) may have bound it
+        tokens = set_request_context(
+            request_id=req_id,
+            method=scope["method"],
+            path=scope["path"],
+            ip=client[0] if client else None,
+        )
         try:
-            req_id = request.headers.get("x-request-id") or str(uuid.uuid4())
-            client_host = request.client.host if request.client else None
-
-            set_request_context(
-                request_id=req_id,
-                method=request.method,
-                path=request.url.path,
-                ip=client_host,
-            )
-
-            response = await call_next(request)
-            # propagate request id to response too (handy for tracing)
-            response.headers["X-Request-ID"] = req_id
-            print(f"^^^^^^^------^^^^response headers: {response.headers}")  # Debugging line
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
-            # always clear context to avoid leakage across requests
-            clear_request_context()
+            # snap back to the previous values to avoid leakage across requests
+            reset_request_context(tokens)
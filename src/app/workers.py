@@ -0,0 +1,11 @@
+# src/app/workers.py
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    Gunicorn worker pinned to uvloop + httptools instead of uvicorn's "auto"
+    detection (which silently falls back to asyncio + h11).
+    Requires uvicorn[standard].
+    """
+    CONFIG_KWARGS = {**BaseUvicornWorker.CONFIG_KWARGS, "loop": "uvloop", "http": "httptools"}
@@ -1,11 +1,15 @@
+import pytest
 from fastapi.testclient import TestClient
+
 from app.main import app
 
-client = TestClient(app)
 
-def test_health():
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_health(client):
     r = client.get("/api/v1/health")
     assert r.status_code == 200
     assert r.json()["status"] == "healthy"
-
-test_health()
\ No newline at end of file
@@ -0,0 +1,74 @@
+import pytest
+from fastapi import HTTPException
+
+from app.security.jwt import create_token, decode_token
+
+
+def test_roundtrip():
+    token = create_token({"sub": "alice", "roles": ["admin"]})
+    payload = decode_token(token)
+    assert payload["sub"] == "alice"
+    assert payload["roles"] == ["admin"]
+    assert payload["exp"] > payload["iat"]
+
+
+def test_expired_token_rejected():
+    token = create_token({"sub": "alice"}, expires_in_minutes=-5)
+    with pytest.raises(HTTPException) as exc:
+        decode_token(token)
+    assert exc.value.status_code == 401
+    assert exc.value.detail == "Token expired"
+
+
+def test_tampered_token_rejected():
+    token = create_token({"sub": "alice"})
+    head, body, sig = token.split(".")
+    with pytest.raises(HTTPException) as exc:
+        decode_token(f"{head}.{body}.{sig[::-1]}")
+    assert exc.value.status_code == 401
+
+
+
+def test_decode_cache_does_not_outlive_exp(monkeypatch):
+    import app.security.jwt as jwt_mod
+
+    token = create_token({"sub": "alice"})
+    payload = decode_token(token)
+
+    real_decode = jwt_mod.jwt.decode
+    calls = []
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt_mod.jwt, "decode", counting_decode)
+
+    hit = decode_token(token)
+    assert hit == payload and hit is not payload  # served from cache, as a copy
+    assert not calls
+
+    # a cached payload never satisfies a different issuer expectation
+    with pytest.raises(HTTPException):
+        decode_token(token, expected_issuer="someone-else")
+    assert len(calls) == 1
+
+    # once the cache believes `exp` has passed, the token is fully re-verified
+    monkeypatch.setattr(jwt_mod.time, "time", lambda: payload["exp"] + 1)
+    decode_token(token)
+    assert len(calls) == 2
+
+
+def test_cached_payload_nested_claims_are_not_shared():
+    token = create_token({"sub": "alice", "roles": ["admin"]})
+    decode_token(token)["roles"].append("root")
+    assert decode_token(token)["roles"] == ["admin"]
+
+
+@pytest.mark.parametrize("first, second", [([1], [True]), ([1], [1.0]), ({"a": 1}, {"a": True})])
+def test_sign_cache_keeps_nested_claim_types_apart(first, second):
+    a = decode_token(create_token({"sub": "u", "roles": first}))
+    b = decode_token(create_token({"sub": "u", "roles": second}))
+    # repr, not ==: [1] == [True] == [1.0]
+    assert repr(a["roles"]) == repr(first)
+    assert repr(b["roles"]) == repr(second)
@@ -0,0 +1,38 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth.jwt_context_middleware import JWTContextMiddleware
+from app.main import app as main_app  # also installs the logging record factory
+from app.security.jwt import create_token
+from app.utils.request_context_middleware import RequestContextMiddleware
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    # mirror app.main's stacking of the two context middlewares
+    for m in reversed(main_app.user_middleware):
+        if m.cls in (RequestContextMiddleware, JWTContextMiddleware):
+            app.add_middleware(m.cls)
+
+    @app.get("/whoami")
+    def whoami():
+        record = logging.makeLogRecord({})
+        return {"user": record.user, "path": record.path}
+
+    return TestClient(app)
+
+
+def test_bearer_user_bound_to_log_context(client):
+    token = create_token({"sub": "alice"})
+    r = client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+    assert r.json() == {"user": "alice", "path": "/whoami"}
+    assert r.headers["x-request-id"]
+
+
+def test_anonymous_request_has_no_user(client):
+    assert client.get("/whoami").json()["user"] is None